@@ -14,7 +14,10 @@ from sqlalchemy import (
     Float,
     Integer,
     String,
+    bindparam,
     create_engine,
+    event,
+    select,
 )
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
@@ -22,11 +25,30 @@ from sqlalchemy.orm import sessionmaker
 # Create base class
 Base = declarative_base()
 
+
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Configure a new SQLite connection for concurrent reads.
+    
+    WAL journaling lets readers proceed while an upload is writing.
+    
+    Args:
+        dbapi_connection: Raw SQLite connection.
+        connection_record: Pool connection record (unused).
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")
+    cursor.close()
+
+
 # Create database engine and session
 engine = create_engine(
     "sqlite:///./pdf_knowledge_base.db",
     connect_args={"check_same_thread": False}
 )
+event.listen(engine, "connect", set_sqlite_pragmas)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
@@ -40,7 +62,7 @@ class PDFDocument(Base):
     file_path = Column(String)
     file_size = Column(Integer)  # in bytes
     uploaded_at = Column(DateTime, default=datetime.datetime.utcnow)
-    processed = Column(Boolean, default=False)
+    processed = Column(Boolean, default=False, index=True)
     processing = Column(Boolean, default=False)
     page_count = Column(Integer, default=0)
     chunks_count = Column(Integer, default=0)
@@ -48,8 +70,44 @@ class PDFDocument(Base):
     error = Column(String, nullable=True)
 
 
+# Filename lookups built once; SQLAlchemy reuses their compiled SQL on every call
+_DOCUMENT_BY_FILENAME = select(PDFDocument).where(
+    PDFDocument.filename == bindparam("filename")
+)
+_PROCESSED_DOCUMENT_BY_FILENAME = _DOCUMENT_BY_FILENAME.where(
+    PDFDocument.processed == True
+)
+
+
+def get_document_by_filename(db, filename, processed_only=False):
+    """Get a PDF document by its filename.
+    
+    Args:
+        db: Database session.
+        filename: Document filename.
+        processed_only: Only match documents that finished processing.
+        
+    Returns:
+        PDFDocument: Matching document, or None if not found.
+    """
+    statement = _PROCESSED_DOCUMENT_BY_FILENAME if processed_only else _DOCUMENT_BY_FILENAME
+    return db.execute(statement, {"filename": filename}).scalar_one_or_none()
+
+
+def init_db(bind=engine):
+    """Create database tables and any indexes missing from existing tables.
+    
+    Args:
+        bind: Engine to create the schema on.
+    """
+    Base.metadata.create_all(bind=bind)
+    # create_all skips existing tables, so add indexes introduced later explicitly
+    for index in PDFDocument.__table__.indexes:
+        index.create(bind=bind, checkfirst=True)
+
+
 # Create database tables
-Base.metadata.create_all(bind=engine)
+init_db()
 
 
 def get_db():
@@ -5,10 +5,12 @@ Provides stdio-based MCP server that exposes PDF knowledge base functionality.
 """
 
 import asyncio
+import logging
 import sys
-from typing import Any, Dict, List
-import json
+import threading
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
 
+import orjson
 from mcp.server.stdio import stdio_server
 from mcp.server import Server
 from mcp.types import (
@@ -19,14 +21,97 @@ from mcp.types import (
     EmbeddedResource,
 )
 
+from sqlalchemy import select, text
+
 # Import existing app components
-from .database import SessionLocal, get_db, PDFDocument, Base, engine
+from .database import (
+    SessionLocal,
+    get_db,
+    PDFDocument,
+    Base,
+    engine,
+    get_document_by_filename,
+    init_db,
+    set_sqlite_pragmas,
+)
 from .vector_store import VectorStore
-from .pdf_processor import PDFProcessor
+from .query_cache import QueryCache
 import os
 
+logger = logging.getLogger("mcp_server")
+
 # Initialize components
-vector_store = VectorStore()
+# The vector store is created on first search so the MCP handshake and the
+# non-search tools never wait for it
+_vector_store: Optional[VectorStore] = None
+_vector_store_lock = asyncio.Lock()
+query_cache = QueryCache()
+_embedding_model = None
+_embedding_model_lock = threading.Lock()
+# The model's fast tokenizer mutates its padding/truncation state on every
+# call and fails ("Already borrowed") when used from two threads at once
+_encode_lock = threading.Lock()
+
+def _get_embedding_model():
+    """Load the query embedding model once and reuse it across tool calls."""
+    global _embedding_model
+    with _embedding_model_lock:
+        if _embedding_model is None:
+            from sentence_transformers import SentenceTransformer
+            _embedding_model = SentenceTransformer("intfloat/e5-large-v2")
+    return _embedding_model
+
+def _encode_query(query_text: str):
+    """Encode a query with the shared embedding model, one call at a time."""
+    embedding_model = _get_embedding_model()
+    with _encode_lock:
+        return embedding_model.encode(query_text)
+
+async def _get_vector_store() -> VectorStore:
+    """Return the shared vector store, creating it on first use."""
+    global _vector_store
+    async with _vector_store_lock:
+        if _vector_store is None:
+            _vector_store = await asyncio.to_thread(VectorStore)
+    return _vector_store
+
+# Strong references to fire-and-forget tasks; the event loop only keeps weak
+# references, so an unreferenced task could be garbage-collected mid-run
+_background_tasks: Set[asyncio.Task] = set()
+
+async def _warm_up():
+    """Load and exercise the embedding model in the background so the first search does not pay for it."""
+    try:
+        await asyncio.to_thread(_encode_query, "query: warm-up")
+    except Exception as e:
+        logger.warning(f"Embedding model warm-up failed: {str(e)}")
+
+# Read-only listings iterate plain rows in batches instead of ORM objects
+_LIST_DOCUMENTS_QUERY = select(
+    PDFDocument.filename,
+    PDFDocument.processed,
+    PDFDocument.processing,
+    PDFDocument.uploaded_at,
+    PDFDocument.file_size
+).execution_options(yield_per=500)
+_LIST_RESOURCES_QUERY = select(PDFDocument.filename).where(
+    PDFDocument.processed == True
+).execution_options(yield_per=500)
+
+# Status text keyed by (processed, processing); processed takes precedence
+_STATUS_TABLE = {
+    (True, False): "completed",
+    (True, True): "completed",
+    (False, True): "processing",
+    (False, False): "failed",
+}
+
+# Resource list cached together with the SQLite data_version it was built at
+_resources_cache: Optional[Tuple[int, List[Resource]]] = None
+
+def _get_data_version(db) -> int:
+    """Return SQLite's data_version, which changes whenever another connection (e.g. an upload) commits."""
+    return db.execute(text("PRAGMA data_version")).scalar()
 
 # Create the server
 server = Server("pdf-rag-mcp")
@@ -34,241 +119,347 @@ server = Server("pdf-rag-mcp")
 @server.list_resources()
 async def handle_list_resources() -> List[Resource]:
     """List available PDF documents as resources."""
-    db = SessionLocal()
-    try:
-        documents = db.query(PDFDocument).filter(PDFDocument.processed == True).all()
+    global _resources_cache
+    with SessionLocal() as db:
+        data_version = _get_data_version(db)
+        if _resources_cache is not None and _resources_cache[0] == data_version:
+            return _resources_cache[1]
         
         resources = []
-        for doc in documents:
+        for (filename,) in db.execute(_LIST_RESOURCES_QUERY):
             resources.append(
                 Resource(
-                    uri=f"pdf://{doc.filename}",
-                    name=doc.filename,
-                    description=f"PDF document: {doc.filename}",
+                    uri=f"pdf://{filename}",
+                    name=filename,
+                    description=f"PDF document: {filename}",
                     mimeType="application/pdf"
                 )
             )
-        return resources
-    finally:
-        db.close()
+    
+    _resources_cache = (data_version, resources)
+    return resources
 
 @server.read_resource()
 async def handle_read_resource(uri: str) -> str:
     """Read content from a PDF document."""
-    if not uri.startswith("pdf://"):
+    # The MCP SDK passes the URI as a pydantic AnyUrl, not a str
+    uri = str(uri)
+    filename = uri.removeprefix("pdf://")
+    if filename == uri:
         raise ValueError(f"Unsupported URI scheme: {uri}")
     
-    filename = uri[6:]  # Remove "pdf://" prefix
-    
-    db = SessionLocal()
-    try:
-        document = db.query(PDFDocument).filter(
-            PDFDocument.filename == filename,
-            PDFDocument.processed == True
-        ).first()
+    with SessionLocal() as db:
+        document = get_document_by_filename(db, filename, processed_only=True)
         
         if not document:
             raise ValueError(f"Document not found: {filename}")
         
         # For now, return basic document info
         # Full content access would require chunk storage implementation
-        content_parts = [
-            f"Document: {document.filename}",
-            f"Pages: {document.page_count}",
-            f"Status: Processed",
-            f"Upload Date: {document.uploaded_at}",
+        return (
+            f"Document: {document.filename}\n"
+            f"Pages: {document.page_count}\n"
+            f"Status: Processed\n"
+            f"Upload Date: {document.uploaded_at}\n"
             f"File Size: {document.file_size} bytes"
-        ]
-        
-        return "\n".join(content_parts)
-    finally:
-        db.close()
+        )
 
-@server.list_tools()
-async def handle_list_tools() -> List[Tool]:
-    """List available tools."""
-    return [
-        Tool(
-            name="search_documents",
-            description="Search through PDF documents using semantic similarity",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "query": {
-                        "type": "string",
-                        "description": "The search query to find relevant content in PDF documents"
-                    },
-                    "limit": {
-                        "type": "integer",
-                        "description": "Maximum number of results to return (default: 5)",
-                        "default": 5
-                    }
+# The tool list is constant, so build it once at import
+_TOOLS = [
+    Tool(
+        name="search_documents",
+        description="Search through PDF documents using semantic similarity",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "query": {
+                    "type": "string",
+                    "description": "The search query to find relevant content in PDF documents"
                 },
-                "required": ["query"]
-            }
-        ),
-        Tool(
-            name="list_documents",
-            description="List all available PDF documents in the knowledge base",
-            inputSchema={
-                "type": "object",
-                "properties": {},
-                "additionalProperties": False
-            }
-        ),
-        Tool(
-            name="get_document_info",
-            description="Get detailed information about a specific document",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "filename": {
-                        "type": "string",
-                        "description": "The filename of the document to get info about"
+                "limit": {
+                    "type": "integer",
+                    "description": "Maximum number of results to return (default: 5)",
+                    "default": 5
+                }
+            },
+            "required": ["query"]
+        }
+    ),
+    Tool(
+        name="list_documents",
+        description="List all available PDF documents in the knowledge base",
+        inputSchema={
+            "type": "object",
+            "properties": {},
+            "additionalProperties": False
+        }
+    ),
+    Tool(
+        name="get_document_info",
+        description="Get detailed information about a specific document",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "filename": {
+                    "type": "string",
+                    "description": "The filename of the document to get info about"
+                }
+            },
+            "required": ["filename"]
+        }
+    ),
+    Tool(
+        name="batch_execute",
+        description="Run several of the other tools in one request and return all of their results",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "calls": {
+                    "type": "array",
+                    "description": "Tool calls to execute",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "name": {
+                                "type": "string",
+                                "description": "Name of the tool to call"
+                            },
+                            "arguments": {
+                                "type": "object",
+                                "description": "Arguments for the tool"
+                            }
+                        },
+                        "required": ["name"]
                     }
                 },
-                "required": ["filename"]
-            }
-        )
-    ]
+                "stopOnError": {
+                    "type": "boolean",
+                    "description": "Run the calls one at a time and skip the rest after the first failure (default: false)",
+                    "default": False
+                }
+            },
+            "required": ["calls"]
+        }
+    )
+]
+
+# How many batch_execute sub-calls run at once
+_BATCH_MAX_CONCURRENT = 4
+
+class ToolError(Exception):
+    """Raised when a tool call fails; the message is the text returned to the client."""
+
+@server.list_tools()
+async def handle_list_tools() -> List[Tool]:
+    """List available tools."""
+    return _TOOLS
 
 @server.call_tool()
 async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
     """Handle tool calls."""
+    try:
+        if name == "batch_execute":
+            result = await _execute_batch_tool(arguments)
+        else:
+            result = await _dispatch_tool(name, arguments)
+    except ToolError as e:
+        result = str(e)
+    
+    # Payloads are serialized once here, so batch results nest as plain JSON
+    if not isinstance(result, str):
+        result = orjson.dumps(result, option=orjson.OPT_INDENT_2).decode()
+    return [TextContent(type="text", text=result)]
+
+async def _dispatch_tool(name: str, arguments: Dict[str, Any]) -> Union[str, Dict[str, Any]]:
+    """Run a single (non-batch) tool and return its JSON payload or plain text.
     
+    Raises:
+        ToolError: If the tool is unknown or the call fails.
+    """
     if name == "search_documents":
         query = arguments.get("query", "")
         limit = arguments.get("limit", 5)
         
         if not query:
-            return [TextContent(type="text", text="Error: Query is required")]
+            raise ToolError("Error: Query is required")
         
         try:
             # Generate query embedding first
-            from sentence_transformers import SentenceTransformer
-            embedding_model = SentenceTransformer("intfloat/e5-large-v2")
+            # Embedding and vector search are CPU-bound, so run them in worker
+            # threads to keep other tool calls on the event loop responsive;
+            # encoding is serialized, only the vector searches run in parallel
             # Add "query: " prefix for e5-large-v2 model
-            query_embedding = embedding_model.encode(f"query: {query}")
-            
-            # Perform semantic search
-            results = vector_store.search(query_embedding, n_results=limit)
-            
-            # Extract results from ChromaDB format
-            documents = results.get("documents", [[]])[0]
-            metadatas = results.get("metadatas", [[]])[0]
-            distances = results.get("distances", [[]])[0]
-            
-            if not documents:
-                return [TextContent(type="text", text="No relevant documents found for your query.")]
-            
-            # Format results
-            response_parts = [f"Found {len(documents)} relevant results for query: '{query}'\n"]
-            
-            for i, (doc, meta, distance) in enumerate(zip(documents, metadatas, distances), 1):
-                # Format results from vector store
-                response_parts.append(
-                    f"\n--- Result {i} ---\n"
-                    f"Relevance Score: {1 - distance:.3f}\n"
-                    f"Content:\n{doc}\n"
-                )
-            
-            return [TextContent(type="text", text="".join(response_parts))]
+            query_embedding = await asyncio.to_thread(_encode_query, f"query: {query}")
             
+            # Reuse results of a recent near-identical query, otherwise search;
+            # cached results are dropped once documents were added or removed
+            with SessionLocal() as db:
+                query_cache.check_version(_get_data_version(db))
+            results = query_cache.get(query_embedding, limit)
+            if results is None:
+                vector_store = await _get_vector_store()
+                results = await asyncio.to_thread(vector_store.search, query_embedding, limit)
+                if results.get("documents", [[]])[0]:
+                    query_cache.add(query_embedding, limit, results)
         except Exception as e:
-            return [TextContent(type="text", text=f"Error performing search: {str(e)}")]
+            raise ToolError(f"Error performing search: {str(e)}") from e
+        
+        # Extract results from ChromaDB format
+        documents = results.get("documents", [[]])[0]
+        distances = results.get("distances", [[]])[0]
+        
+        if not documents:
+            return "No relevant documents found for your query."
+        
+        # Format results from vector store
+        return {
+            "query": query,
+            "results": [
+                {"rank": i, "relevance": round(1 - distance, 3), "content": doc}
+                for i, (doc, distance) in enumerate(zip(documents, distances), 1)
+            ]
+        }
     
     elif name == "list_documents":
-        db = SessionLocal()
         try:
-            documents = db.query(PDFDocument).all()
-            
-            if not documents:
-                return [TextContent(type="text", text="No documents found in the knowledge base.")]
-            
-            response_parts = ["Available documents in the knowledge base:\n\n"]
-            
-            for doc in documents:
-                status_emoji = "✅" if doc.processed else "⏳" if doc.processing else "❌"
-                status_text = "completed" if doc.processed else "processing" if doc.processing else "failed"
-                response_parts.append(
-                    f"{status_emoji} {doc.filename}\n"
-                    f"   Status: {status_text}\n"
-                    f"   Upload Date: {doc.uploaded_at}\n"
-                    f"   File Size: {doc.file_size} bytes\n\n"
-                )
-            
-            return [TextContent(type="text", text="".join(response_parts))]
-            
+            with SessionLocal() as db:
+                documents = [
+                    {
+                        "filename": filename,
+                        "status": _STATUS_TABLE[bool(processed), bool(processing)],
+                        "uploaded_at": uploaded_at,
+                        "file_size": file_size
+                    }
+                    for filename, processed, processing, uploaded_at, file_size in db.execute(_LIST_DOCUMENTS_QUERY)
+                ]
         except Exception as e:
-            return [TextContent(type="text", text=f"Error listing documents: {str(e)}")]
-        finally:
-            db.close()
+            raise ToolError(f"Error listing documents: {str(e)}") from e
+        
+        if not documents:
+            return "No documents found in the knowledge base."
+        
+        return {"documents": documents}
     
     elif name == "get_document_info":
         filename = arguments.get("filename", "")
         
         if not filename:
-            return [TextContent(type="text", text="Error: Filename is required")]
+            raise ToolError("Error: Filename is required")
         
-        db = SessionLocal()
         try:
-            document = db.query(PDFDocument).filter(PDFDocument.filename == filename).first()
-            
-            if not document:
-                return [TextContent(type="text", text=f"Document '{filename}' not found.")]
-            
-            # Get chunk count from document
-            chunk_count = document.chunks_count
-            
-            status_text = "completed" if document.processed else "processing" if document.processing else "failed"
-            response = (
-                f"Document Information: {document.filename}\n\n"
-                f"Status: {status_text}\n"
-                f"Upload Date: {document.uploaded_at}\n"
-                f"File Size: {document.file_size} bytes\n"
-                f"Number of Chunks: {chunk_count}\n"
-                f"Page Count: {document.page_count}\n"
-                f"File Path: {document.file_path}\n"
-            )
-            
-            if document.processed and chunk_count > 0:
-                response += f"\nDocument is ready for searching and contains {chunk_count} searchable chunks."
-            elif document.processing:
-                response += "\nDocument is currently being processed."
-            else:
-                response += "\nDocument processing may have failed or is incomplete."
-            
-            return [TextContent(type="text", text=response)]
-            
+            with SessionLocal() as db:
+                document = get_document_by_filename(db, filename)
         except Exception as e:
-            return [TextContent(type="text", text=f"Error getting document info: {str(e)}")]
-        finally:
-            db.close()
+            raise ToolError(f"Error getting document info: {str(e)}") from e
+        
+        if not document:
+            raise ToolError(f"Document '{filename}' not found.")
+        
+        # Get chunk count from document
+        chunk_count = document.chunks_count
+        
+        status_text = _STATUS_TABLE[bool(document.processed), bool(document.processing)]
+        if document.processed and chunk_count > 0:
+            status_note = f"Document is ready for searching and contains {chunk_count} searchable chunks."
+        elif document.processing:
+            status_note = "Document is currently being processed."
+        else:
+            status_note = "Document processing may have failed or is incomplete."
+        
+        return (
+            f"Document Information: {document.filename}\n\n"
+            f"Status: {status_text}\n"
+            f"Upload Date: {document.uploaded_at}\n"
+            f"File Size: {document.file_size} bytes\n"
+            f"Number of Chunks: {chunk_count}\n"
+            f"Page Count: {document.page_count}\n"
+            f"File Path: {document.file_path}\n"
+            f"\n{status_note}"
+        )
+    
+    else:
+        raise ToolError(f"Unknown tool: {name}")
+
+async def _execute_batch_tool(arguments: Dict[str, Any]) -> Dict[str, Any]:
+    """Run the sub-calls of a batch_execute request and return their results payload.
+    
+    Sub-calls run concurrently and share the scoped database session on the
+    event loop thread. A sub-call fails when it raises; with stopOnError, the
+    calls run one at a time and those after the first failure are skipped.
+    
+    Raises:
+        ToolError: If no calls are given.
+    """
+    calls = arguments.get("calls")
+    
+    if not isinstance(calls, list) or not calls:
+        raise ToolError("Error: At least one call is required")
+    
+    semaphore = asyncio.Semaphore(_BATCH_MAX_CONCURRENT)
     
+    async def run_call(call: Dict[str, Any]) -> Union[str, Dict[str, Any]]:
+        # Nested batches are rejected by the dispatcher as unknown tools
+        async with semaphore:
+            return await _dispatch_tool(call.get("name"), call.get("arguments") or {})
+    
+    calls = [call if isinstance(call, dict) else {} for call in calls]
+    if arguments.get("stopOnError", False):
+        # Concurrent calls could all finish before a failure is seen, so each
+        # call only starts once the previous one succeeded
+        outcomes = []
+        for call in calls:
+            try:
+                outcomes.append(await run_call(call))
+            except Exception as e:
+                outcomes.append(e)
+                break
     else:
-        return [TextContent(type="text", text=f"Unknown tool: {name}")]
+        outcomes = await asyncio.gather(*(run_call(call) for call in calls), return_exceptions=True)
+    
+    results = []
+    for i, call in enumerate(calls):
+        if i >= len(outcomes):
+            results.append({"name": call.get("name"), "status": "skipped"})
+        elif isinstance(outcomes[i], BaseException):
+            results.append({"name": call.get("name"), "status": "error", "error": str(outcomes[i])})
+        else:
+            results.append({"name": call.get("name"), "status": "ok", "result": outcomes[i]})
+    
+    return {"results": results}
 
 async def main():
     """Main entry point for the MCP server."""
     # Ensure we're using the correct database path (in backend folder)
     import os
-    from sqlalchemy import create_engine
-    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy import create_engine, event
+    from sqlalchemy.orm import scoped_session, sessionmaker
+    from sqlalchemy.pool import StaticPool
     
     # Point to the backend folder's database
     backend_dir = os.path.dirname(os.path.dirname(__file__))  # Go up from app/ to backend/
     db_path = os.path.join(backend_dir, 'pdf_knowledge_base.db')
     
     # Create new engine with absolute path to backend database
+    # A single shared SQLite connection and a thread-local session are reused
+    # across tool calls instead of opening new ones per handler invocation
     global engine, SessionLocal
     engine = create_engine(
         f"sqlite:///{os.path.abspath(db_path)}",
-        connect_args={"check_same_thread": False}
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    event.listen(engine, "connect", set_sqlite_pragmas)
+    SessionLocal = scoped_session(
+        sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
     )
-    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
     
     # Initialize database tables
-    Base.metadata.create_all(bind=engine)
+    init_db(bind=engine)
+    
+    # Warm up the embedding model without delaying the MCP handshake
+    warm_up_task = asyncio.create_task(_warm_up())
+    _background_tasks.add(warm_up_task)
+    warm_up_task.add_done_callback(_background_tasks.discard)
     
     # Run the server
     async with stdio_server() as (read_stream, write_stream):
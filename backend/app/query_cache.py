@@ -0,0 +1,141 @@
+"""Query Cache Module.
+
+This module provides a bounded similarity cache that short-circuits vector searches for repeated or near-duplicate queries.
+"""
+
+# Standard library imports
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+# Third-party library imports
+import numpy as np
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("query_cache")
+
+
+class QueryCache:
+    """Similarity cache keyed by query embedding.
+
+    Recent query embeddings are kept L2-normalized in a fixed-size matrix used
+    as a ring buffer, so a lookup is a single matrix-vector product. A cached
+    result is returned when the cosine similarity to a stored query reaches the
+    threshold and the entry has not expired; the oldest entry is evicted first.
+    """
+
+    def __init__(self, capacity: int = 4096, threshold: float = 0.97, ttl: float = 300.0):
+        """Initialize query cache.
+
+        Args:
+            capacity: Maximum number of cached queries.
+            threshold: Minimum cosine similarity for a cache hit.
+            ttl: Seconds after which a cached entry is considered stale.
+        """
+        self.capacity = capacity
+        self.threshold = threshold
+        self.ttl = ttl
+        self._vectors: Optional[np.ndarray] = None
+        self._entries: List[Optional[Tuple[int, Dict[str, Any], float]]] = [None] * capacity
+        self._next = 0
+        self._size = 0
+        self._version: Optional[int] = None
+
+    @staticmethod
+    def _normalize(query_embedding: np.ndarray) -> Optional[np.ndarray]:
+        """Return the query embedding as a unit-length float32 vector."""
+        vector = np.asarray(query_embedding, dtype=np.float32).reshape(-1)
+        norm = float(np.linalg.norm(vector))
+        if norm == 0.0:
+            return None
+        return vector / norm
+
+    def _best_match(self, vector: np.ndarray) -> Tuple[int, float]:
+        """Return the slot and cosine similarity of the closest cached query."""
+        scores = self._vectors[:self._size] @ vector
+        best = int(np.argmax(scores))
+        return best, float(scores[best])
+
+    def get(self, query_embedding: np.ndarray, n_results: int) -> Optional[Dict[str, Any]]:
+        """Look up cached search results for a query.
+
+        Args:
+            query_embedding: Query vector embedding.
+            n_results: Number of results requested.
+
+        Returns:
+            Dict: Cached search results, or None on a miss.
+        """
+        if self._size == 0:
+            return None
+
+        vector = self._normalize(query_embedding)
+        if vector is None or vector.shape[0] != self._vectors.shape[1]:
+            return None
+
+        best, score = self._best_match(vector)
+        if score < self.threshold:
+            return None
+
+        cached_n_results, results, timestamp = self._entries[best]
+        if cached_n_results != n_results or time.monotonic() - timestamp > self.ttl:
+            return None
+
+        logger.info(f"Query cache hit, similarity: {score:.4f}")
+        return results
+
+    def add(self, query_embedding: np.ndarray, n_results: int, results: Dict[str, Any]):
+        """Store search results for a query.
+
+        A near-duplicate of an already cached query replaces that entry;
+        otherwise the oldest entry is evicted when the cache is full.
+
+        Args:
+            query_embedding: Query vector embedding.
+            n_results: Number of results requested.
+            results: Search results returned by the vector store.
+        """
+        vector = self._normalize(query_embedding)
+        if vector is None:
+            return
+
+        if self._vectors is None or self._vectors.shape[1] != vector.shape[0]:
+            self._vectors = np.zeros((self.capacity, vector.shape[0]), dtype=np.float32)
+            self._entries = [None] * self.capacity
+            self._next = 0
+            self._size = 0
+
+        if self._size > 0:
+            slot, score = self._best_match(vector)
+            if score >= self.threshold:
+                self._vectors[slot] = vector
+                self._entries[slot] = (n_results, results, time.monotonic())
+                return
+
+        slot = self._next
+        self._vectors[slot] = vector
+        self._entries[slot] = (n_results, results, time.monotonic())
+        self._next = (slot + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def check_version(self, version: int):
+        """Clear the cache if the document corpus changed since the last check.
+
+        Args:
+            version: Value that changes whenever documents are added or removed.
+        """
+        if version != self._version:
+            if self._size:
+                logger.info("Document corpus changed, clearing query cache")
+            self.clear()
+            self._version = version
+
+    def clear(self):
+        """Remove all cached entries."""
+        self._entries = [None] * self.capacity
+        self._next = 0
+        self._size = 0
@@ -20,6 +20,41 @@ logging.basicConfig(
 )
 logger = logging.getLogger("vector_store")
 
+# Name of the collection holding PDF chunks
+COLLECTION_NAME = "pdf_documents"
+
+# HNSW index parameters. Chroma fixes these when the collection is created,
+# so they only take effect for a new database or after reset(); an existing
+# collection keeps the settings it was built with.
+HNSW_SPACE = os.getenv("PDF_RAG_HNSW_SPACE", "cosine")
+HNSW_M = int(os.getenv("PDF_RAG_HNSW_M", "16"))
+HNSW_CONSTRUCTION_EF = int(os.getenv("PDF_RAG_HNSW_CONSTRUCTION_EF", "100"))
+HNSW_SEARCH_EF = int(os.getenv("PDF_RAG_HNSW_SEARCH_EF", "64"))
+HNSW_METADATA = {
+    "hnsw:space": HNSW_SPACE,
+    "hnsw:M": HNSW_M,
+    "hnsw:construction_ef": HNSW_CONSTRUCTION_EF,
+    "hnsw:search_ef": HNSW_SEARCH_EF,
+}
+
+# Values chromadb 0.4.x/0.5.x uses when a collection was created without HNSW
+# metadata; chromadb 1.x reports its effective settings in the collection
+# configuration instead (with different defaults, e.g. ef_search 100)
+_CHROMA_HNSW_DEFAULTS = {
+    "hnsw:space": "l2",
+    "hnsw:M": 16,
+    "hnsw:construction_ef": 100,
+    "hnsw:search_ef": 10,
+}
+
+# chromadb 1.x configuration keys for each HNSW metadata key
+_CHROMA_HNSW_CONFIGURATION_KEYS = {
+    "hnsw:space": "space",
+    "hnsw:M": "max_neighbors",
+    "hnsw:construction_ef": "ef_construction",
+    "hnsw:search_ef": "ef_search",
+}
+
 
 class VectorStore:
     """Vector storage class for managing and accessing the vector database."""
@@ -49,7 +84,7 @@ class VectorStore:
         try:
             # Use persistence configuration
             self.client = chromadb.PersistentClient(path=persist_directory)
-            self.collection = self.client.get_or_create_collection("pdf_documents")
+            self.collection = self._get_or_create_collection()
             logger.info(
                 f"Successfully connected to vector database, current document count: {self.collection.count()}"
             )
@@ -57,6 +92,57 @@ class VectorStore:
             logger.error(f"Error connecting to vector database: {str(e)}")
             raise
     
+    def _get_or_create_collection(self):
+        """Get the document collection, creating it with HNSW settings if missing.
+        
+        An existing collection is opened as-is, without rewriting its metadata,
+        and a warning is logged if it was built with different HNSW settings.
+        
+        Returns:
+            Collection: ChromaDB collection for PDF chunks.
+        """
+        try:
+            collection = self.client.get_collection(COLLECTION_NAME)
+        except Exception:
+            return self.client.get_or_create_collection(COLLECTION_NAME, metadata=HNSW_METADATA)
+        
+        existing = self._get_hnsw_settings(collection)
+        mismatched = {
+            key: existing[key]
+            for key, value in HNSW_METADATA.items()
+            if existing[key] != value
+        }
+        if mismatched:
+            logger.warning(
+                f"Existing collection '{COLLECTION_NAME}' was built with HNSW settings {mismatched}, "
+                f"which differ from the configured {HNSW_METADATA}; reset and re-index the "
+                f"documents for the configured settings to apply"
+            )
+        return collection
+    
+    @staticmethod
+    def _get_hnsw_settings(collection) -> Dict[str, Any]:
+        """Return the HNSW settings a collection was built with, keyed like HNSW_METADATA.
+        
+        Args:
+            collection: ChromaDB collection.
+        
+        Returns:
+            Dict: Effective HNSW settings of the collection.
+        """
+        # chromadb 1.x: the collection configuration holds the effective values
+        configuration = getattr(collection, "configuration", None) or {}
+        hnsw = configuration.get("hnsw")
+        if hnsw:
+            return {
+                key: hnsw.get(config_key, _CHROMA_HNSW_DEFAULTS[key])
+                for key, config_key in _CHROMA_HNSW_CONFIGURATION_KEYS.items()
+            }
+        
+        # chromadb 0.4.x/0.5.x: only explicitly set values appear in the metadata
+        metadata = collection.metadata or {}
+        return {key: metadata.get(key, default) for key, default in _CHROMA_HNSW_DEFAULTS.items()}
+    
     def add_documents(
         self, 
         chunks: List[str], 
@@ -200,8 +286,10 @@ class VectorStore:
         try:
             logger.info(f"Executing vector search, requested result count: {n_results}")
             
+            # Single contiguous float32 row, matching the stored embeddings
+            query_vector = np.ascontiguousarray(query_embedding, dtype=np.float32).reshape(-1)
             query_params = {
-                "query_embeddings": [query_embedding.tolist()],
+                "query_embeddings": [query_vector.tolist()],
                 "n_results": n_results
             }
             
@@ -259,8 +347,8 @@ class VectorStore:
         """
         try:
             logger.info("Resetting vector database...")
-            self.client.delete_collection("pdf_documents")
-            self.collection = self.client.get_or_create_collection("pdf_documents")
+            self.client.delete_collection(COLLECTION_NAME)
+            self.collection = self._get_or_create_collection()
             
             # Ensure data persistence
             if hasattr(self.client, "persist"):
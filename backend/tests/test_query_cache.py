@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add project root directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.query_cache import QueryCache
+
+
+def _results(label):
+    """Build a minimal ChromaDB-style result dictionary."""
+    return {"documents": [[label]], "metadatas": [[{}]], "distances": [[0.1]]}
+
+
+def _unit(*values):
+    """Build a unit-length query embedding."""
+    vector = np.array(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def test_hit_at_or_above_threshold():
+    cache = QueryCache(capacity=4, threshold=0.97)
+    cache.add(_unit(1, 0, 0), 5, _results("a"))
+
+    assert cache.get(_unit(1, 0, 0), 5) == _results("a")
+    # cos(angle) of about 0.98, above the threshold
+    assert cache.get(_unit(1, 0.2, 0), 5) == _results("a")
+    # cos(angle) of about 0.71, below the threshold
+    assert cache.get(_unit(1, 1, 0), 5) is None
+
+
+def test_hit_ignores_embedding_scale():
+    cache = QueryCache(capacity=4)
+    cache.add(np.array([2.0, 0.0, 0.0]), 5, _results("a"))
+
+    assert cache.get(np.array([0.5, 0.0, 0.0]), 5) == _results("a")
+
+
+def test_miss_on_different_n_results():
+    cache = QueryCache(capacity=4)
+    cache.add(_unit(1, 0, 0), 5, _results("a"))
+
+    assert cache.get(_unit(1, 0, 0), 3) is None
+
+
+def test_entry_expires_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("app.query_cache.time.monotonic", lambda: now[0])
+    cache = QueryCache(capacity=4, ttl=10.0)
+    cache.add(_unit(1, 0, 0), 5, _results("a"))
+
+    now[0] += 10.0
+    assert cache.get(_unit(1, 0, 0), 5) == _results("a")
+    now[0] += 0.1
+    assert cache.get(_unit(1, 0, 0), 5) is None
+
+
+def test_oldest_entry_evicted_when_full():
+    cache = QueryCache(capacity=2)
+    cache.add(_unit(1, 0, 0), 5, _results("a"))
+    cache.add(_unit(0, 1, 0), 5, _results("b"))
+    cache.add(_unit(0, 0, 1), 5, _results("c"))
+
+    assert cache.get(_unit(1, 0, 0), 5) is None
+    assert cache.get(_unit(0, 1, 0), 5) == _results("b")
+    assert cache.get(_unit(0, 0, 1), 5) == _results("c")
+
+
+def test_near_duplicate_replaces_existing_slot():
+    cache = QueryCache(capacity=2)
+    cache.add(_unit(1, 0, 0), 5, _results("a"))
+    cache.add(_unit(0, 1, 0), 5, _results("b"))
+    # Replaces "a" instead of evicting the oldest entry
+    cache.add(_unit(1, 0.01, 0), 5, _results("a2"))
+
+    assert cache.get(_unit(1, 0, 0), 5) == _results("a2")
+    assert cache.get(_unit(0, 1, 0), 5) == _results("b")
+
+
+def test_version_change_clears_cache():
+    cache = QueryCache(capacity=4)
+    cache.check_version(1)
+    cache.add(_unit(1, 0, 0), 5, _results("a"))
+
+    cache.check_version(1)
+    assert cache.get(_unit(1, 0, 0), 5) == _results("a")
+    cache.check_version(2)
+    assert cache.get(_unit(1, 0, 0), 5) is None
@@ -0,0 +1,45 @@
+#!/usr/bin/env python
+
+import os
+import sys
+from pathlib import Path
+
+# Add repository root directory to Python path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+# upload_pdf changes into the backend directory on import
+_cwd = os.getcwd()
+import upload_pdf
+os.chdir(_cwd)
+
+
+def _stub_uploader(monkeypatch):
+    """Build an uploader that records uploads instead of storing and processing them."""
+    uploader = upload_pdf.PDFUploader()
+    uploaded = []
+
+    def fake_upload(pdf_path):
+        uploaded.append(pdf_path)
+        return len(uploaded), pdf_path, Path(pdf_path).name
+
+    async def fake_process_all(jobs, max_concurrent):
+        return [True] * len(jobs)
+
+    monkeypatch.setattr(uploader, "_upload_pdf", fake_upload)
+    monkeypatch.setattr(uploader, "_process_all_async", fake_process_all)
+    return uploader, uploaded
+
+
+def test_distinct_filenames_all_uploaded(monkeypatch):
+    uploader, uploaded = _stub_uploader(monkeypatch)
+
+    assert uploader.upload_and_process_pdfs(["a/one.pdf", "b/two.pdf"]) is True
+    assert uploaded == ["a/one.pdf", "b/two.pdf"]
+
+
+def test_duplicate_filename_rejected(monkeypatch):
+    uploader, uploaded = _stub_uploader(monkeypatch)
+
+    # The second doc.pdf would replace the first one's record while it is queued
+    assert uploader.upload_and_process_pdfs(["a/doc.pdf", "b/doc.pdf"]) is False
+    assert uploaded == ["a/doc.pdf"]
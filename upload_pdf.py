@@ -1,14 +1,16 @@
 #!/usr/bin/env python3
 """
 PDF Upload Script - CLI tool to upload and process PDFs without using the web UI.
-Usage: python upload_pdf.py <path_to_pdf_file>
+Usage: python upload_pdf.py <path_to_pdf_file> [<path_to_pdf_file> ...]
 """
 
 import sys
 import os
 import asyncio
 import shutil
+import uuid
 from pathlib import Path
+from typing import List, Optional, Tuple
 
 # Change to backend directory so database paths work correctly
 script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -18,39 +20,87 @@ os.chdir(backend_dir)
 # Add backend to path
 sys.path.insert(0, backend_dir)
 
-from backend.app.database import SessionLocal, PDFDocument, Base, engine
-from backend.app.pdf_processor import PDFProcessor
-from backend.app.vector_store import VectorStore
+from backend.app.database import SessionLocal, PDFDocument, get_document_by_filename, init_db
+
+# Maximum number of PDFs processed at the same time
+MAX_CONCURRENT = 4
 
 class PDFUploader:
     def __init__(self):
-        # Initialize components
-        self.pdf_processor = PDFProcessor()
-        self.vector_store = VectorStore()
+        # The PDF processor loads the embedding model, so it is created on first use
+        self._pdf_processor = None
         
         # Ensure database tables exist
-        Base.metadata.create_all(bind=engine)
+        init_db()
         
         # Create uploads directory if it doesn't exist
-        self.uploads_dir = os.path.join(os.path.dirname(__file__), 'backend', 'uploads')
-        os.makedirs(self.uploads_dir, exist_ok=True)
+        self.uploads_dir = Path(__file__).parent / 'backend' / 'uploads'
+        self.uploads_dir.mkdir(parents=True, exist_ok=True)
+    
+    @property
+    def pdf_processor(self):
+        """PDF processor, created once the first upload has passed validation."""
+        if self._pdf_processor is None:
+            # Imported on first use, so validation alone never loads the PDF and embedding stack
+            from backend.app.pdf_processor import PDFProcessor
+            self._pdf_processor = PDFProcessor()
+        return self._pdf_processor
     
     def upload_and_process_pdf(self, pdf_path: str) -> bool:
         """Upload and process a PDF file."""
+        return self.upload_and_process_pdfs([pdf_path])
+    
+    def upload_and_process_pdfs(self, pdf_paths: List[str], max_concurrent: int = MAX_CONCURRENT) -> bool:
+        """Upload several PDF files and process them in a single event loop."""
+        jobs = []
+        all_uploaded = True
+        uploaded_filenames = set()
+        for pdf_path in pdf_paths:
+            # Documents are stored by filename, so reprocessing a second file with
+            # the same name would delete the first one's record while it is queued
+            filename = Path(pdf_path).name
+            if filename in uploaded_filenames:
+                print(f"❌ Error: A file named '{filename}' is already part of this upload: {pdf_path}")
+                all_uploaded = False
+                continue
+            
+            job = self._upload_pdf(pdf_path)
+            if job is None:
+                all_uploaded = False
+            else:
+                jobs.append(job)
+                uploaded_filenames.add(filename)
+        
+        if not jobs:
+            return False
+        
+        # Process the PDFs
+        print("🔄 Starting PDF processing...")
+        results = asyncio.run(self._process_all_async(jobs, max_concurrent))
+        return all_uploaded and all(results)
+    
+    def _upload_pdf(self, pdf_path: str) -> Optional[Tuple[int, str, str]]:
+        """Validate a PDF, copy it to the uploads directory and create its database record.
+        
+        Returns (document ID, stored path, filename), or None if the upload did not happen.
+        """
         try:
-            # Validate PDF file exists
-            if not os.path.exists(pdf_path):
+            # Validate PDF file exists; a single stat also provides the size
+            path = Path(pdf_path)
+            try:
+                file_stat = path.stat()
+            except FileNotFoundError:
                 print(f"❌ Error: File not found: {pdf_path}")
-                return False
+                return None
             
             # Validate it's a PDF file
-            if not pdf_path.lower().endswith('.pdf'):
+            if path.suffix.lower() != '.pdf':
                 print(f"❌ Error: File must be a PDF: {pdf_path}")
-                return False
+                return None
             
             # Get file info
-            file_size = os.path.getsize(pdf_path)
-            filename = os.path.basename(pdf_path)
+            file_size = file_stat.st_size
+            filename = path.name
             
             print(f"📁 Processing PDF: {filename}")
             print(f"📊 File size: {file_size:,} bytes")
@@ -58,23 +108,25 @@ class PDFUploader:
             # Check if file already exists in database
             db = SessionLocal()
             try:
-                existing_doc = db.query(PDFDocument).filter(PDFDocument.filename == filename).first()
+                existing_doc = get_document_by_filename(db, filename)
                 if existing_doc:
                     print(f"⚠️  Warning: Document '{filename}' already exists in database")
                     response = input("Do you want to reprocess it? (y/N): ")
                     if response.lower() != 'y':
                         print("❌ Upload cancelled")
-                        return False
+                        return None
                     
                     # Delete existing document
                     db.delete(existing_doc)
                     db.commit()
                     print("🗑️  Deleted existing document record")
                 
-                # Copy file to uploads directory
-                dest_path = os.path.join(self.uploads_dir, filename)
-                shutil.copy2(pdf_path, dest_path)
-                print(f"📋 Copied file to: {dest_path}")
+                # Link or copy file to uploads directory
+                dest_path = str(self.uploads_dir / filename)
+                if self._link_or_copy(pdf_path, dest_path):
+                    print(f"🔗 Linked file to: {dest_path}")
+                else:
+                    print(f"📋 Copied file to: {dest_path}")
                 
                 # Create database record
                 pdf_document = PDFDocument(
@@ -90,33 +142,76 @@ class PDFUploader:
                 db.refresh(pdf_document)
                 
                 print(f"💾 Created database record with ID: {pdf_document.id}")
-                
-                # Process the PDF
-                print("🔄 Starting PDF processing...")
-                success = asyncio.run(self._process_pdf_async(pdf_document.id, dest_path, filename))
-                
-                if success:
-                    print("✅ PDF processing completed successfully!")
-                    print(f"📚 Document '{filename}' is now available for searching")
-                    return True
-                else:
-                    print("❌ PDF processing failed!")
-                    return False
+                return pdf_document.id, dest_path, filename
                     
             finally:
                 db.close()
                 
         except Exception as e:
             print(f"❌ Error during upload: {str(e)}")
-            return False
+            return None
+    
+    @staticmethod
+    def _link_or_copy(src_path: str, dest_path: str) -> bool:
+        """Place a file in the uploads directory, hardlinking it when possible.
+        
+        The file is linked or copied under a fresh temporary name and then moved
+        over dest_path. An existing upload, which may itself be a hardlink to an
+        earlier source file, is replaced rather than written through.
+        
+        Returns True if the file was linked, False if it was copied.
+        """
+        # Uploading a file that already is the stored upload: nothing to do
+        if os.path.exists(dest_path) and os.path.samefile(src_path, dest_path):
+            return True
+        
+        tmp_path = os.path.join(os.path.dirname(dest_path), f".{uuid.uuid4().hex}.tmp")
+        try:
+            # A hardlink shares the data without copying it; removing the upload
+            # later (e.g. on document deletion) leaves the source file intact
+            linked = False
+            if os.name != "nt":
+                try:
+                    os.link(src_path, tmp_path)
+                    linked = True
+                except OSError:
+                    # Different filesystem or links not supported
+                    pass
+            
+            if not linked:
+                shutil.copy2(src_path, tmp_path)
+            os.replace(tmp_path, dest_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        
+        return linked
+    
+    async def _process_all_async(self, jobs: List[Tuple[int, str, str]], max_concurrent: int) -> List[bool]:
+        """Process uploaded PDFs concurrently, at most max_concurrent at a time."""
+        semaphore = asyncio.Semaphore(max_concurrent)
+        
+        async def process_one(pdf_id: int, pdf_path: str, filename: str) -> bool:
+            async with semaphore:
+                success = await self._process_pdf_async(pdf_id, pdf_path, filename)
+            
+            if success:
+                print(f"📚 Document '{filename}' is now available for searching")
+            else:
+                print(f"❌ PDF processing failed: {filename}")
+            return success
+        
+        return await asyncio.gather(*(process_one(*job) for job in jobs))
     
     async def _process_pdf_async(self, pdf_id: int, pdf_path: str, filename: str) -> bool:
         """Process PDF using the existing PDFProcessor method."""
         try:
             # Use the existing process_pdf method from PDFProcessor
-            await self.pdf_processor.process_pdf(pdf_id, pdf_path, filename)
-            print("✨ PDF processing completed successfully!")
-            return True
+            success = await self.pdf_processor.process_pdf(pdf_id, pdf_path, filename)
+            if success:
+                print(f"✨ PDF processing completed successfully: {filename}")
+            return success
             
         except Exception as e:
             print(f"❌ Error during processing: {str(e)}")
@@ -124,27 +219,27 @@ class PDFUploader:
 
 def main():
     """Main entry point."""
-    if len(sys.argv) != 2:
-        print("Usage: python upload_pdf.py <path_to_pdf_file>")
+    if len(sys.argv) < 2:
+        print("Usage: python upload_pdf.py <path_to_pdf_file> [<path_to_pdf_file> ...]")
         print("Example: python upload_pdf.py \"C:\\Documents\\my_book.pdf\"")
         sys.exit(1)
     
-    pdf_path = sys.argv[1]
+    pdf_paths = sys.argv[1:]
     
     print("🚀 PDF Upload and Processing Tool")
     print("=" * 40)
     
     uploader = PDFUploader()
-    success = uploader.upload_and_process_pdf(pdf_path)
+    success = uploader.upload_and_process_pdfs(pdf_paths)
     
     if success:
-        print("\n🎉 Success! Your PDF has been uploaded and processed.")
+        print("\n🎉 Success! Your PDFs have been uploaded and processed.")
         print("You can now search for content using:")
         print("- The web interface at http://localhost:8000")
         print("- Claude Desktop MCP tools")
         print("- Cursor MCP integration")
     else:
-        print("\n💥 Failed to upload and process PDF.")
+        print("\n💥 Failed to upload and process one or more PDFs.")
         sys.exit(1)
 
 if __name__ == "__main__":